@@ -1,8 +1,13 @@
 import argparse
 import fnmatch
+import functools
+import io
+import itertools
 import os
-import sqlite3
+import re
 import sys
+import threading
+from collections import deque
 
 IGNORED_DIRS = {
     ".git",
@@ -29,88 +34,165 @@ IGNORED_FILES = {
     "yarn.lock",
     "poetry.lock",
 }
-INCLUDE_HIDDEN_FILES = {".env.example", ".gitignore", ".dockerignore"}
+INCLUDE_HIDDEN_FILES = frozenset({".env.example", ".gitignore", ".dockerignore"})
 
-SQLITE_EXTENSIONS = {".db", ".sqlite", ".sqlite3"}
+SQLITE_EXTENSIONS = frozenset({".db", ".sqlite", ".sqlite3"})
 SQLITE_EXACT_FILENAMES = {"database"}
 
+EXTENSION_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".jsx": "javascript",
+    ".html": "html",
+    ".css": "css",
+    ".scss": "scss",
+    ".json": "json",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".md": "markdown",
+    ".sh": "shell",
+    ".rb": "ruby",
+    ".java": "java",
+    ".c": "c",
+    ".cpp": "cpp",
+    ".cs": "csharp",
+    ".go": "go",
+    ".php": "php",
+    ".rs": "rust",
+    ".sql": "sql",
+    ".xml": "xml",
+    ".toml": "toml",
+    ".dockerfile": "dockerfile",
+    "Dockerfile": "dockerfile",
+    ".ini": "ini",
+    ".conf": "conf",
+}
+
+SQLITE_COLUMNS_QUERY = """
+    SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk
+    FROM scan.sqlite_master AS m
+    JOIN pragma_table_info(m.name, 'scan') AS p
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite!_%' ESCAPE '!'
+    ORDER BY m.rowid, p.cid
+"""
+SQLITE_FOREIGN_KEYS_QUERY = """
+    SELECT m.name, p."table", p."from", p."to"
+    FROM scan.sqlite_master AS m
+    JOIN pragma_foreign_key_list(m.name, 'scan') AS p
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite!_%' ESCAPE '!'
+    ORDER BY m.rowid, p.id, p.seq
+"""
+
+MAX_FILE_SIZE = 2 * 1024 * 1024
+BINARY_SNIFF_BYTES = 4096
+
+SQLITE_SCHEMA_CACHE = {}
+
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+GLOB_CHARS = frozenset("*?[")
+
+STD_OUTPUT_HANDLE = -11
+ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+
+
+def compile_patterns(patterns):
+    literals = frozenset(p for p in patterns if GLOB_CHARS.isdisjoint(p))
+    globs = sorted(p for p in patterns if p not in literals)
+    if not globs:
+        return literals, None
+    return literals, re.compile("|".join(fnmatch.translate(p) for p in globs))
+
+
+def get_extension(name):
+    _, dot, ext = name.rpartition(".")
+    return "." + ext.lower() if dot else ""
+
 
 class ProjectScanner:
     def __init__(self, source_dir):
         self.source_dir = os.path.abspath(source_dir)
         self.project_name = os.path.basename(self.source_dir)
-
-    def matches_any_pattern(self, name, patterns):
-        for pattern in patterns:
-            if fnmatch.fnmatch(name, pattern):
-                return True
-        return False
-
-    def get_language_hint(self, filename):
-        extension_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".tsx": "typescript",
-            ".jsx": "javascript",
-            ".html": "html",
-            ".css": "css",
-            ".scss": "scss",
-            ".json": "json",
-            ".yml": "yaml",
-            ".yaml": "yaml",
-            ".md": "markdown",
-            ".sh": "shell",
-            ".rb": "ruby",
-            ".java": "java",
-            ".c": "c",
-            ".cpp": "cpp",
-            ".cs": "csharp",
-            ".go": "go",
-            ".php": "php",
-            ".rs": "rust",
-            ".sql": "sql",
-            ".xml": "xml",
-            ".toml": "toml",
-            ".dockerfile": "dockerfile",
-            "Dockerfile": "dockerfile",
-            ".ini": "ini",
-            ".conf": "conf",
-        }
-        _, ext = os.path.splitext(filename)
-        if ext in extension_map:
-            return extension_map[ext]
-        if filename in extension_map:
-            return extension_map[filename]
-        return ""
+        self._walk_result = None
+        self._schema_conn = None
+        self._active_reads = 0
+        self._schema_lock = threading.Lock()
+        self._ignored_dirs = compile_patterns(IGNORED_DIRS)
+        self._ignored_files = compile_patterns(IGNORED_FILES)
+
+    def _matches(self, name, compiled):
+        literals, globs = compiled
+        if name in literals:
+            return True
+        return globs is not None and globs.match(name) is not None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def get_language_hint(filename):
+        ext = get_extension(filename)
+        return EXTENSION_MAP.get(ext) or EXTENSION_MAP.get(filename, "")
 
     def get_sqlite_schema(self, db_path):
-        if not os.path.exists(db_path):
+        try:
+            db_stat = os.stat(db_path)
+        except OSError:
             return f"Error: Database file '{db_path}' not found."
+        version = (db_stat.st_mtime_ns, db_stat.st_size)
+        try:
+            wal_stat = os.stat(db_path + "-wal")
+        except OSError:
+            pass
+        else:
+            version += (wal_stat.st_mtime_ns, wal_stat.st_size)
+
+        cache_key = os.path.abspath(db_path)
+        with self._schema_lock:
+            cached = SQLITE_SCHEMA_CACHE.get(cache_key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            schema, ok = self._read_sqlite_schema(db_path)
+            if ok:
+                SQLITE_SCHEMA_CACHE[cache_key] = (version, schema)
+            if not self._active_reads:
+                self._close_schema_conn()
+        return schema
+
+    def _read_sqlite_schema(self, db_path):
+        import pathlib
+        import sqlite3
 
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
+            if self._schema_conn is None:
+                self._schema_conn = sqlite3.connect(
+                    ":memory:", uri=True, check_same_thread=False
+                )
+            conn = self._schema_conn
+            conn.execute(
+                "ATTACH DATABASE ? AS scan",
+                (pathlib.Path(os.path.abspath(db_path)).as_uri() + "?mode=ro",),
+            )
+            try:
+                columns = conn.execute(SQLITE_COLUMNS_QUERY).fetchall()
+                foreign_keys = {
+                    table_name: list(rows)
+                    for table_name, rows in itertools.groupby(
+                        conn.execute(SQLITE_FOREIGN_KEYS_QUERY), key=lambda row: row[0]
+                    )
+                }
+            finally:
+                conn.execute("DETACH DATABASE scan")
 
             markdown_output = []
             markdown_output.append(f"# SQLite Schema: {os.path.basename(db_path)}\n")
 
-            for table_name_tuple in tables:
-                table_name = table_name_tuple[0]
-                if table_name.startswith("sqlite_"):
-                    continue
-
+            for table_name, rows in itertools.groupby(columns, key=lambda row: row[0]):
                 markdown_output.append(f"## Table: `{table_name}`")
-                cursor.execute(f"PRAGMA table_info('{table_name}')")
-                columns = cursor.fetchall()
-
                 markdown_output.append("| Column | Type | Nullable | PK | Default |")
                 markdown_output.append("|---|---|---|---|---|")
 
-                for col in columns:
-                    cid, name, dtype, notnull, dflt_value, pk = col
+                for _, name, dtype, notnull, dflt_value, pk in rows:
                     is_nullable = "No" if notnull else "Yes"
                     is_pk = "✅" if pk else ""
                     dflt = f"`{dflt_value}`" if dflt_value is not None else ""
@@ -119,98 +201,175 @@ class ProjectScanner:
                     )
 
                 markdown_output.append("")
-                cursor.execute(f"PRAGMA foreign_key_list('{table_name}')")
-                fks = cursor.fetchall()
+                fks = foreign_keys.get(table_name)
 
                 if fks:
                     markdown_output.append("**Foreign Keys:**")
-                    for fk in fks:
-                        target_table = fk[2]
-                        source_col = fk[3]
-                        target_col = fk[4]
+                    for _, target_table, source_col, target_col in fks:
                         markdown_output.append(
                             f"- `{source_col}` references `{target_table}({target_col})`"
                         )
                     markdown_output.append("")
                 markdown_output.append("---\n")
 
-            conn.close()
             if not markdown_output:
-                return "Database is empty or contains no user tables."
-            return "\n".join(markdown_output)
+                return "Database is empty or contains no user tables.", True
+            return "\n".join(markdown_output), True
 
-        except sqlite3.Error as e:
-            return f"SQLite Error reading schema: {e}"
+        except (sqlite3.Error, ValueError) as e:
+            return f"SQLite Error reading schema: {e}", False
 
-    def generate_tree_structure(self):
-        tree_lines = [f"# {self.project_name} Project Structure", "```"]
-        for root, dirs, files in os.walk(self.source_dir, topdown=True):
-            dirs[:] = [d for d in dirs if not self.matches_any_pattern(d, IGNORED_DIRS)]
-
-            files_to_show = [
-                f
-                for f in files
-                if not self.matches_any_pattern(f, IGNORED_FILES)
-                and (
-                    not f.startswith(".")
-                    or self.matches_any_pattern(f, INCLUDE_HIDDEN_FILES)
-                )
-            ]
+    def _close_schema_conn(self):
+        if self._schema_conn is not None:
+            self._schema_conn.close()
+            self._schema_conn = None
+
+    def _scan(self, path):
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield entry, True
+                elif entry.is_file(follow_symlinks=False) or (
+                    entry.is_symlink() and entry.is_file()
+                ):
+                    yield entry, False
+
+    def _walk(self):
+        if self._walk_result is not None:
+            return self._walk_result
+
+        tree = io.StringIO()
+        tree.write(f"# {self.project_name} Project Structure\n```\n")
+        file_tasks = []
+        base = os.path.join(self.source_dir, "")
+        base_len = len(base)
+        stack = [(self.source_dir, 0)]
+        while stack:
+            root, level = stack.pop()
+            dirs = []
+            files = []
+            for entry, is_dir in self._scan(root):
+                name = entry.name
+                if is_dir:
+                    if not self._matches(name, self._ignored_dirs):
+                        dirs.append((name, entry.path))
+                elif (
+                    name[0] != "." or name in INCLUDE_HIDDEN_FILES
+                ) and not self._matches(name, self._ignored_files):
+                    files.append((name, entry))
 
-            level = root.replace(self.source_dir, "").count(os.sep)
             indent = " " * 4 * level
-            tree_lines.append(f"{indent}{os.path.basename(root)}/")
+            tree.write(f"{indent}{os.path.basename(root)}/\n")
             subindent = " " * 4 * (level + 1)
-            for f in sorted(files_to_show):
-                tree_lines.append(f"{subindent}{f}")
-        tree_lines.append("```")
-        return "\n".join(tree_lines)
 
-    def process_directory(self):
-        all_files_content = []
-        for root, dirs, files in os.walk(self.source_dir, topdown=True):
-            dirs[:] = [d for d in dirs if not self.matches_any_pattern(d, IGNORED_DIRS)]
+            files.sort()
+            for name, entry in files:
+                tree.write(f"{subindent}{name}\n")
+                path = entry.path
+                if path.startswith(base):
+                    relative_path = path[base_len:]
+                else:
+                    relative_path = os.path.relpath(path, self.source_dir)
+                is_sqlite = (get_extension(name) in SQLITE_EXTENSIONS) or (
+                    name in SQLITE_EXACT_FILENAMES
+                )
+                file_tasks.append((relative_path, entry, is_sqlite))
 
-            for file in sorted(files):
-                if self.matches_any_pattern(file, IGNORED_FILES):
-                    continue
+            dirs.sort(reverse=True)
+            stack.extend((path, level + 1) for _, path in dirs)
 
-                if file.startswith(".") and not self.matches_any_pattern(
-                    file, INCLUDE_HIDDEN_FILES
-                ):
-                    continue
+        tree.write("```")
+        self._walk_result = (tree.getvalue(), file_tasks)
+        return self._walk_result
+
+    def generate_tree_structure(self):
+        tree, _ = self._walk()
+        return tree
 
-                file_path = os.path.join(root, file)
-                relative_path = os.path.relpath(file_path, self.source_dir)
+    def _read_text(self, entry):
+        size = entry.stat().st_size
+        if size > MAX_FILE_SIZE:
+            return f"(skipped: {size / 1024 / 1024:.2f} MB is over the size limit)"
 
-                _, ext = os.path.splitext(file)
-                is_sqlite = (ext.lower() in SQLITE_EXTENSIONS) or (
-                    file in SQLITE_EXACT_FILENAMES
-                )
+        data = bytearray(size)
+        with open(entry.path, "rb", buffering=0) as f:
+            read = f.readinto(data)
+        del data[read:]
+
+        if data.find(b"\x00", 0, BINARY_SNIFF_BYTES) != -1:
+            return "(skipped: binary file)"
+
+        content = data.decode("utf-8", "replace")
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content
+
+    def _read_one(self, task):
+        relative_path, entry, is_sqlite = task
+        try:
+            if is_sqlite:
+                content = self.get_sqlite_schema(entry.path)
+                lang_hint = "markdown"
+            else:
+                content = self._read_text(entry)
+                lang_hint = self.get_language_hint(entry.name)
+        except Exception as e:
+            return None, f"Could not read file {entry.path}: {e}"
+
+        formatted_content = (
+            f"\n---\n\n"
+            f"**File:** `{relative_path}`\n\n"
+            f"```{lang_hint}\n"
+            f"{content}\n"
+            f"```"
+        )
+        return formatted_content, None
+
+    def _read_all(self, file_tasks):
+        from concurrent.futures import ThreadPoolExecutor
 
-                try:
-                    if is_sqlite:
-                        content = self.get_sqlite_schema(file_path)
-                        lang_hint = "markdown"
+        errors = []
+        with self._schema_lock:
+            self._active_reads += 1
+        try:
+            with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+                remaining = iter(file_tasks)
+                pending = deque(
+                    executor.submit(self._read_one, task)
+                    for task in itertools.islice(remaining, READ_WORKERS * 2)
+                )
+                while pending:
+                    block, error = pending.popleft().result()
+                    task = next(remaining, None)
+                    if task is not None:
+                        pending.append(executor.submit(self._read_one, task))
+                    if error:
+                        errors.append(error)
                     else:
-                        with open(
-                            file_path, "r", encoding="utf-8", errors="ignore"
-                        ) as f:
-                            content = f.read()
-                        lang_hint = self.get_language_hint(file)
-
-                    formatted_content = (
-                        f"\n---\n\n"
-                        f"**File:** `{relative_path}`\n\n"
-                        f"```{lang_hint}\n"
-                        f"{content}\n"
-                        f"```"
-                    )
-                    all_files_content.append(formatted_content)
-                except Exception as e:
-                    print(f"Could not read file {file_path}: {e}")
+                        yield block
+        finally:
+            with self._schema_lock:
+                self._active_reads -= 1
+                if not self._active_reads:
+                    self._close_schema_conn()
+
+        if errors:
+            sys.stderr.write("\n".join(errors) + "\n")
 
-        return "\n".join(all_files_content)
+    def scan(self):
+        tree, file_tasks = self._walk()
+        return tree, self._read_all(file_tasks)
+
+    def iter_file_blocks(self):
+        _, content = self.scan()
+        return content
+
+    def process_directory(self):
+        return "\n".join(self.iter_file_blocks())
 
 
 class SkillManager:
@@ -255,7 +414,7 @@ class SkillManager:
             "The following skills are active for this session. Adopt these roles and guidelines:\n"
         )
 
-        for skill_file in sorted(list(self.selected_skills)):
+        for skill_file in sorted(self.selected_skills):
             path = os.path.join(self.skills_dir, skill_file)
             try:
                 with open(path, "r", encoding="utf-8") as f:
@@ -267,13 +426,31 @@ class SkillManager:
         return "\n".join(output)
 
 
+@functools.lru_cache(maxsize=None)
+def enable_ansi_escapes():
+    if os.name != "nt":
+        return True
+
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(STD_OUTPUT_HANDLE)
+        mode = ctypes.c_ulong()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        mode.value |= ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode))
+    except (AttributeError, OSError):
+        return False
+
+
 def clear_screen():
-    if os.name == "nt":
-        os.system("cls")
-    else:
+    if enable_ansi_escapes():
         sys.stdout.write("\033[H\033[2J\033[3J")
         sys.stdout.flush()
-        os.system("clear")
+    else:
+        os.system("cls")
 
 
 def get_input_with_cancel(prompt):
@@ -287,27 +464,26 @@ def get_input_with_cancel(prompt):
 
 
 def run_generation(source_dir, output_file, skill_manager=None):
-    scanner = ProjectScanner(source_dir)
     IGNORED_FILES.add(os.path.basename(output_file))
+    scanner = ProjectScanner(source_dir)
 
     try:
-        tree = scanner.generate_tree_structure()
-        content = scanner.process_directory()
-
-        final_output = []
-
-        if skill_manager:
-            skills_content = skill_manager.get_compiled_skills()
-            if skills_content:
-                final_output.append(skills_content)
-                final_output.append("\n# PROJECT CONTEXT START\n")
-
-        final_output.append(tree)
-        final_output.append("\n# FILE CONTENTS\n")
-        final_output.append(content)
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(final_output))
+        tree, content = scanner.scan()
+
+        with open(output_file, "w", encoding="utf-8", buffering=1 << 20) as f:
+            if skill_manager:
+                skills_content = skill_manager.get_compiled_skills()
+                if skills_content:
+                    f.write(skills_content)
+                    f.write("\n\n# PROJECT CONTEXT START\n\n")
+
+            f.write(tree)
+            f.write("\n\n# FILE CONTENTS\n\n")
+            separator = ""
+            for block in content:
+                f.write(separator)
+                f.write(block)
+                separator = "\n"
 
         size_kb = os.path.getsize(output_file) / 1024
         return f"SUCCESS! Saved to '{os.path.basename(output_file)}' ({size_kb:.2f} KB)"
@@ -413,6 +589,9 @@ def main():
     parser.add_argument(
         "--interactive", "-i", action="store_true", help="Force interactive mode"
     )
+    parser.add_argument(
+        "--quiet", "-q", action="store_true", help="Suppress status messages"
+    )
 
     args = parser.parse_args()
 
@@ -434,9 +613,14 @@ def main():
             print_usage_hint()
             sys.exit(1)
 
-        print(f"Scanning project: {source_dir}")
+        if not args.quiet:
+            print(f"Scanning project: {source_dir}")
         result_msg = run_generation(source_dir, output_file)
-        print(result_msg)
+        if result_msg.startswith("ERROR:"):
+            sys.stderr.write(result_msg + "\n")
+            sys.exit(1)
+        if not args.quiet:
+            print(result_msg)
 
 
 if __name__ == "__main__":